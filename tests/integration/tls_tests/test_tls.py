@@ -167,16 +167,14 @@ async def test_set_tls_key(ops_test: OpsTest) -> None:
         )
 
     with open(f"{TLS_TEST_DATA}/internal-key.pem") as f:
-        internal_key_contents = f.readlines()
-        internal_key_contents = "".join(internal_key_contents)
+        internal_key_contents = f.read()
 
     # set external and internal key for each unit
     for unit_id in range(len(ops_test.model.applications[app_name].units)):
         unit = ops_test.model.applications[app_name].units[unit_id]
 
         with open(f"{TLS_TEST_DATA}/external-key-{unit_id}.pem") as f:
-            external_key_contents = f.readlines()
-            external_key_contents = "".join(external_key_contents)
+            external_key_contents = f.read()
 
         key_settings = {
             "internal-key": internal_key_contents,
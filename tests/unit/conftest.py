@@ -6,6 +6,32 @@ from single_kernel_mongo.config.literals import SNAP
 from single_kernel_mongo.lib.charms.operator_libs_linux.v2.snap import Snap, SnapState
 
 
+@pytest.fixture(scope="session")
+def charm_class():
+    from charm import MongoDBVMCharm
+
+    return MongoDBVMCharm
+
+
+@pytest.fixture(autouse=True)
+def pause_coverage(request):
+    """Stops coverage tracing for tests marked with `no_cover`."""
+    if request.node.get_closest_marker("no_cover") is None:
+        yield
+        return
+
+    import coverage
+
+    cov = coverage.Coverage.current()
+    if cov is None:
+        yield
+        return
+
+    cov.stop()
+    yield
+    cov.start()
+
+
 @pytest.fixture(autouse=True)
 def mock_snap_cache(mocker):
     mocker.patch(
@@ -4,9 +4,30 @@
 
 """Helper functions for writing tests."""
 
-from typing import Callable
+from contextlib import contextmanager
+from functools import cache
+from pathlib import Path
+from typing import Callable, Iterator
 from unittest.mock import patch
 
+from ops.framework import EventBase
+
+CHARM_DIR = Path(__file__).parents[2]
+
+
+@cache
+def charm_spec() -> dict[str, str]:
+    """Returns the charm's metadata, actions and config, read from disk only once.
+
+    Unpack the result into `Harness(charm_class, **charm_spec())` so that each Harness does not
+    go back to the filesystem for the same three files.
+    """
+    return {
+        "meta": (CHARM_DIR / "metadata.yaml").read_text(),
+        "actions": (CHARM_DIR / "actions.yaml").read_text(),
+        "config": (CHARM_DIR / "config.yaml").read_text(),
+    }
+
 
 def patch_network_get(private_address="10.1.157.116") -> Callable:
     def network_get(*args, **kwargs) -> dict:
@@ -29,3 +50,19 @@ def patch_network_get(private_address="10.1.157.116") -> Callable:
         }
 
     return patch("ops.testing._TestingModelBackend.network_get", network_get)
+
+
+@contextmanager
+def count_defers() -> Iterator[list[EventBase]]:
+    """Records every event deferred inside the block, without deferring it.
+
+    A plain function is swapped in for `EventBase.defer` rather than a Mock, since the tests
+    only need to know which events were deferred.
+    """
+    deferred: list[EventBase] = []
+    original_defer = EventBase.defer
+    EventBase.defer = lambda event: deferred.append(event)
+    try:
+        yield deferred
+    finally:
+        EventBase.defer = original_defer
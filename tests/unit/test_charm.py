@@ -24,17 +24,17 @@ from single_kernel_mongo.utils.mongodb_users import (
 
 from charm import MongoDBVMCharm
 
-from .helpers import patch_network_get
+from .helpers import charm_spec, count_defers, patch_network_get
 
 logger = logging.getLogger()
 
 PEER_ADDR = {"private-address": "127.4.5.6"}
 
-PYMONGO_EXCEPTIONS = [
+PYMONGO_EXCEPTIONS = (
     ConnectionFailure("error message"),
     ConfigurationError("error message"),
     OperationFailure("error message"),
-]
+)
 
 S3_RELATION_NAME = "s3-credentials"
 
@@ -58,7 +58,10 @@ class TestCharm(unittest.TestCase):
         return_value="1",
     )
     def setUp(self, *unused):
-        self.harness = Harness(MongoDBVMCharm)
+        network_get = patch_network_get(private_address="1.1.1.1")
+        network_get.start()
+        self.addCleanup(network_get.stop)
+        self.harness = Harness(MongoDBVMCharm, **charm_spec())
         self.addCleanup(self.harness.cleanup)
         self.harness.begin()
         with self.harness.hooks_disabled():
@@ -74,7 +77,6 @@ class TestCharm(unittest.TestCase):
         self.harness.set_leader(True)
         self.harness.set_leader(False)
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     def test_on_start_not_leader_doesnt_initialise_replica_set(self):
         """Tests that a non leader unit does not initialise the replica set."""
@@ -90,7 +92,6 @@ class TestCharm(unittest.TestCase):
             patched_start.assert_called()
             patched_mongo_initialise.assert_not_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     def test_on_start_snap_failure_leads_to_blocked_status(
         self,
@@ -104,7 +105,6 @@ class TestCharm(unittest.TestCase):
             self.harness.charm.on.start.emit()
             self.assertTrue(isinstance(self.harness.charm.unit.status, BlockedStatus))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     def test_on_start_mongod_not_ready_defer(
         self,
@@ -119,7 +119,6 @@ class TestCharm(unittest.TestCase):
             self.harness.charm.on.start.emit()
             self.assertTrue(isinstance(self.harness.charm.unit.status, WaitingStatus))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     def test_start_unable_to_open_tcp_moves_to_blocked(
         self,
@@ -140,7 +139,6 @@ class TestCharm(unittest.TestCase):
             BlockedStatus("failed to open TCP port for MongoDB"),
         )
 
-    @patch_network_get(private_address="1.1.1.1")
     def test_install_snap_packages_failure(
         self,
     ):
@@ -152,7 +150,6 @@ class TestCharm(unittest.TestCase):
             self.harness.charm.on.install.emit()
             self.assertTrue(isinstance(self.harness.charm.unit.status, BlockedStatus))
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.lib.charms.operator_libs_linux.v0.sysctl.Config.configure")
     @patch("single_kernel_mongo.core.vm_workload.VMWorkload.install", return_value=True)
     @pytest.mark.usefixtures("mock_fs_interactions")
@@ -161,7 +158,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.on.install.emit()
         patched_os_config.assert_called_once_with(OS_REQUIREMENTS)
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.status.StatusManager.process_and_share_statuses")
     def test_app_hosts(self, *unused):
         rel_id = self.harness.charm.model.get_relation("database-peers").id
@@ -180,7 +176,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.on.database_peers_relation_joined.emit(relation=rel)
         connection.return_value.__enter__.assert_not_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
@@ -214,7 +209,6 @@ class TestCharm(unittest.TestCase):
         add_replset_member.assert_not_called()
         defer.assert_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.add_replset_member",
@@ -260,7 +254,6 @@ class TestCharm(unittest.TestCase):
                     rm_replset_member.assert_not_called()
             defer.assert_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.add_replset_member",
@@ -281,9 +274,7 @@ class TestCharm(unittest.TestCase):
         get_members.return_value = {"1.1.1.1"}
         rel = self.harness.charm.model.get_relation("database-peers")
 
-        exceptions = PYMONGO_EXCEPTIONS
-        exceptions.append(NotReadyError)
-        for exception in exceptions:
+        for exception in (*PYMONGO_EXCEPTIONS, NotReadyError):
             add_member.side_effect = exception
 
             # simulate 2nd MongoDB unit joining( need a unit to join before removing a unit)
@@ -293,7 +284,6 @@ class TestCharm(unittest.TestCase):
             add_member.assert_called()
             defer.assert_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.init_replset",
@@ -318,7 +308,6 @@ class TestCharm(unittest.TestCase):
             assert isinstance(self.harness.charm.unit.status, WaitingStatus)
             self.assertTrue(isinstance(self.harness.charm.unit.status, WaitingStatus))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.get_status")
@@ -352,7 +341,6 @@ class TestCharm(unittest.TestCase):
                 self.harness.charm.status_manager.process_and_share_statuses()
                 self.assertEqual(self.harness.charm.unit.status, mongodb_status)
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.get_status")
@@ -381,7 +369,6 @@ class TestCharm(unittest.TestCase):
                 self.harness.charm.status_manager.process_and_share_statuses()
                 self.assertEqual(self.harness.charm.unit.status, pbm_status)
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.get_status")
@@ -402,7 +389,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.status_manager.process_and_share_statuses()
         self.assertEqual(self.harness.charm.unit.status, ActiveStatus("mongodb"))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.get_status")
     def test_update_status_no_s3(
@@ -418,7 +404,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.status_manager.process_and_share_statuses()
         self.assertEqual(self.harness.charm.unit.status, ActiveStatus("mongodb"))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
@@ -439,7 +424,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.status_manager.process_and_share_statuses()
         self.assertEqual(self.harness.charm.unit.status, ActiveStatus("Primary"))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
@@ -459,7 +443,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.status_manager.process_and_share_statuses()
         self.assertEqual(self.harness.charm.unit.status, ActiveStatus(""))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
@@ -496,7 +479,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.status_manager.process_and_share_statuses()
         self.assertEqual(self.harness.charm.unit.status, BlockedStatus("unknown"))
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
@@ -513,7 +495,6 @@ class TestCharm(unittest.TestCase):
             WaitingStatus("Waiting for MongoDB to start"),
         )
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.primary",
@@ -526,7 +507,6 @@ class TestCharm(unittest.TestCase):
         output = self.harness.run_action("get-primary")
         assert output.results["replica-set-primary"] == "mongodb/0"
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.primary",
@@ -546,7 +526,6 @@ class TestCharm(unittest.TestCase):
         output = self.harness.run_action("get-primary")
         assert output.results["replica-set-primary"] == "mongodb/1"
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.primary",
@@ -570,7 +549,6 @@ class TestCharm(unittest.TestCase):
         primary = self.harness.charm.operator.primary_unit_name
         self.assertEqual(primary, None)
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.primary",
@@ -584,7 +562,6 @@ class TestCharm(unittest.TestCase):
             mock_primary.side_effect = exception
             self.assertEqual(self.harness.charm.operator.primary_unit_name, None)
 
-    @patch_network_get(private_address="1.1.1.1")
     @pytest.mark.usefixtures("mock_fs_interactions")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.remove_replset_member",
@@ -596,15 +573,12 @@ class TestCharm(unittest.TestCase):
         technically possible to defer the event, it shouldn't be. This test verifies that no
         attempt to defer storage detached as made.
         """
-        exceptions = PYMONGO_EXCEPTIONS
-        exceptions.append(NotReadyError)
-        for exception in exceptions:
+        for exception in (*PYMONGO_EXCEPTIONS, NotReadyError):
             remove_replset_member.side_effect = exception
-            event = mock.Mock()
-            self.harness.charm.on.mongodb_storage_detaching.emit(mock.Mock())
-            event.defer.assert_not_called()
+            with count_defers() as deferred:
+                self.harness.charm.on.mongodb_storage_detaching.emit(mock.Mock(name="storage"))
+            self.assertEqual(deferred, [])
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.core.vm_workload.VMWorkload.run_bin_command")
     def test_start_init_user_after_second_call(self, run):
         """Tests that the creation of the admin user is only performed once.
@@ -624,7 +598,6 @@ class TestCharm(unittest.TestCase):
         self.harness.charm.operator.mongo_manager.initialise_operator_user()
         run.assert_called_once()
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     def test_set_password(self, pbm_status, *unused):
@@ -642,7 +615,6 @@ class TestCharm(unittest.TestCase):
         # verify app data is updated and results are reported to user
         self.assertNotEqual(original_password, new_password)
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     def test_set_password_provided(self, pbm_status, *unused):
@@ -659,7 +631,6 @@ class TestCharm(unittest.TestCase):
         assert output.results["password"] == "canonical123"
         assert output.results["secret-id"]
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     def test_set_password_failure(self, pbm_status, set_user_password):
@@ -670,7 +641,7 @@ class TestCharm(unittest.TestCase):
             Scope.APP, "operator-password"
         )
 
-        for exception in [PYMONGO_EXCEPTIONS, NotReadyError]:
+        for exception in (*PYMONGO_EXCEPTIONS, NotReadyError):
             set_user_password.side_effect = exception
             with pytest.raises(ActionFailed):
                 self.harness.run_action("set-password")
@@ -787,7 +758,6 @@ class TestCharm(unittest.TestCase):
 
         connect_exporter.assert_not_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch(
         "single_kernel_mongo.managers.config.MongoDBExporterConfigManager.configure_and_restart"
@@ -801,7 +771,6 @@ class TestCharm(unittest.TestCase):
         self.harness.run_action("set-password", {"username": "monitor"})
         connect_exporter.assert_called()
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch(
         "single_kernel_mongo.managers.config.MongoDBExporterConfigManager.configure_and_restart"
@@ -832,7 +801,6 @@ class TestCharm(unittest.TestCase):
         # a new password was created
         assert pw1 != pw2
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.set_user_password")
     @patch(
         "single_kernel_mongo.managers.config.MongoDBExporterConfigManager.configure_and_restart"
@@ -845,7 +813,6 @@ class TestCharm(unittest.TestCase):
         output = self.harness.run_action("get-password", {"username": "monitor"})
         assert output.results["password"]
 
-    @patch_network_get(private_address="1.1.1.1")
     @patch("single_kernel_mongo.managers.backups.BackupManager.get_status")
     def test_set_backup_password_pbm_busy(self, pbm_status):
         """Tests changes to passwords fail when pbm is restoring/backing up."""
@@ -859,7 +826,6 @@ class TestCharm(unittest.TestCase):
             current_password = self.harness.charm.operator.state.get_user_password(user)
             self.assertEqual(current_password, original_password)
 
-    @patch_network_get(private_address="1.1.1.1")
     def test_unit_host(self):
         """Tests that get hosts returns the current unit hosts."""
         assert self.harness.charm.operator.state.unit_peer_data.internal_address == "1.1.1.1"
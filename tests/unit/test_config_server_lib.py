@@ -14,7 +14,7 @@ from single_kernel_mongo.exceptions import (
 
 from charm import MongoDBVMCharm
 
-from .helpers import patch_network_get
+from .helpers import charm_spec, patch_network_get
 
 RELATION_NAME = "s3-credentials"
 
@@ -26,7 +26,7 @@ class TestConfigServerInterface(unittest.TestCase):
     )
     @patch_network_get(private_address="1.1.1.1")
     def setUp(self, *unused):
-        self.harness = Harness(MongoDBVMCharm)
+        self.harness = Harness(MongoDBVMCharm, **charm_spec())
         self.harness.begin()
         self.harness.add_relation("database-peers", "database-peers")
         self.harness.set_leader(True)
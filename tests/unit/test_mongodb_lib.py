@@ -1,20 +1,18 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-import unittest
-from unittest.mock import call, patch
-
 import pytest
 import tenacity
 from pymongo.errors import ConfigurationError, ConnectionFailure, OperationFailure
 from single_kernel_mongo.utils.mongo_connection import MongoConnection, NotReadyError
 from tenacity.stop import stop_base
 
-PYMONGO_EXCEPTIONS = [
+PYMONGO_EXCEPTIONS = (
     (ConnectionFailure("error message"), ConnectionFailure),
     (ConfigurationError("error message"), ConfigurationError),
     (OperationFailure("error message"), OperationFailure),
-]
+)
+NEVER_RETRY = tenacity.retry_if_not_result(lambda _: True)
 
 
 class MockStop(stop_base):
@@ -30,191 +28,192 @@ def tenacity_wait(mocker):
     mocker.patch("tenacity.nap.time")
 
 
-class TestMongo(unittest.TestCase):
-    @patch("single_kernel_mongo.utils.mongo_connection.stop_after_delay", new=MockStop)
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_is_ready_error_handling(self, config, mock_client):
-        """Test failure to check ready of replica returns False.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, _ in PYMONGO_EXCEPTIONS:
-            with MongoConnection(config) as mongo:
-                mock_client.return_value.admin.command.side_effect = exception
-
-                #  verify ready is false when an error occurs
-                ready = mongo.is_ready
-                self.assertEqual(ready, False)
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.stop_after_attempt", new=MockStop)
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_init_replset_error_handling(self, config, mock_client):
-        """Test failure to initialise replica set raises an error.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            config.replset = "my-replset"
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.init_replset()
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_get_replset_members_error_handling(self, config, mock_client):
-        """Test failure to get replica set members raises an error.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.get_replset_members()
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_add_replset_members_pymongo_error_handling(self, config, mock_client):
-        """Test failures related to PyMongo properly get handled in add_replset_member.
-
-        Test also verifies that when an exception is raised we still close the client connection
-        and that no attempt to replSetReconfig is made.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.add_replset_member("hostname")
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_sync")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_add_replset_member_wait_to_sync(self, config, mock_client, any_sync):
-        """Tests that adding replica set members raises NotReadyError if another member is syncing.
-
-        Test also verifies that when an exception is raised we still close the client connection
-        and that no attempt to replSetReconfig is made.
-        """
-        any_sync.return_value = True
-        with self.assertRaises(NotReadyError):
-            with MongoConnection(config) as mongo:
-                mongo.add_replset_member("hostname")
-
-        # verify we close connection and that no attempt to reconfigure was made
-        (mock_client.return_value.close).assert_called()
-
-        actual_calls = mock_client.return_value.admin.command.mock_calls
-        no_reconfig = call("replSetReconfig") not in actual_calls
-        self.assertEqual(no_reconfig, True)
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_remove_replset_members_pymongo_error_handling(self, config, mock_client):
-        """Test failures related to PyMongo properly get handled in remove_replset_member.
-
-        Test also verifies that when an exception is raised we still close the client connection
-        and that no attempt to replSetReconfig is made.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    # disable tenacity retry
-                    mongo.remove_replset_member.retry.retry = tenacity.retry_if_not_result(
-                        lambda x: True
-                    )
-
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.remove_replset_member("hostname")
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_removing")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_remove_replset_member_wait_to_remove(self, config, mock_client, any_remove):
-        """Tests removing replica set members raises NotReadyError if another member is removing.
-
-        Test also verifies that when an exception is raised we still close the client connection
-        and that no attempt to replSetReconfig is made.
-        """
-        any_remove.return_value = True
-        with self.assertRaises(NotReadyError):
-            with MongoConnection(config) as mongo:
-                # disable tenacity retry
-                mongo.remove_replset_member.retry.retry = tenacity.retry_if_not_result(
-                    lambda x: True
-                )
-
-                mongo.remove_replset_member("hostname")
-
-        # verify we close connection and that no attempt to reconfigure was made
-        (mock_client.return_value.close).assert_called()
-
-        actual_calls = mock_client.return_value.admin.command.mock_calls
-        no_reconfig = call("replSetReconfig") not in actual_calls
-        self.assertEqual(no_reconfig, True)
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_removing")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_create_user_error_handling(self, config, mock_client, any_remove):
-        """Test failures related to PyMongo properly get handled when creating a user.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.create_user(config.username, config.password, config.roles)
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_update_user_error_handling(self, config, mock_client):
-        """Test failures related to PyMongo properly get handled when updating a user.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.update_user(config)
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
-
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
-    @patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
-    def test_drop_user_error_handling(self, config, mock_client):
-        """Test failures related to PyMongo properly get handled when dropping a user.
-
-        Test also verifies that when an exception is raised we still close the client connection.
-        """
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            with self.assertRaises(expected_raise):
-                with MongoConnection(config) as mongo:
-                    mock_client.return_value.admin.command.side_effect = exception
-                    mongo.drop_user("username")
-
-            # verify we close connection
-            (mock_client.return_value.close).assert_called()
+@pytest.fixture(autouse=True)
+def disable_retries(monkeypatch):
+    monkeypatch.setattr("single_kernel_mongo.utils.mongo_connection.stop_after_delay", MockStop)
+    monkeypatch.setattr("single_kernel_mongo.utils.mongo_connection.stop_after_attempt", MockStop)
+    monkeypatch.setattr(MongoConnection.remove_replset_member.retry, "retry", NEVER_RETRY)
+
+
+@pytest.fixture
+def mock_client(mocker):
+    return mocker.patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
+
+
+@pytest.fixture
+def config(mocker):
+    return mocker.patch("single_kernel_mongo.utils.mongo_config.MongoConfiguration")
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_is_ready_error_handling(mock_client, config, exception, expected_raise):
+    """Test failure to check ready of replica returns False.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with MongoConnection(config) as mongo:
+        #  verify ready is false when an error occurs
+        ready = mongo.is_ready
+        assert ready is False
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_init_replset_error_handling(mock_client, config, exception, expected_raise):
+    """Test failure to initialise replica set raises an error.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    config.replset = "my-replset"
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.init_replset()
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_get_replset_members_error_handling(mock_client, config, exception, expected_raise):
+    """Test failure to get replica set members raises an error.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.get_replset_members()
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_add_replset_members_pymongo_error_handling(
+    mock_client, config, exception, expected_raise
+):
+    """Test failures related to PyMongo properly get handled in add_replset_member.
+
+    Test also verifies that when an exception is raised we still close the client connection
+    and that no attempt to replSetReconfig is made.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.add_replset_member("hostname")
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+def test_add_replset_member_wait_to_sync(mocker, mock_client, config):
+    """Tests that adding replica set members raises NotReadyError if another member is syncing.
+
+    Test also verifies that when an exception is raised we still close the client connection
+    and that no attempt to replSetReconfig is made.
+    """
+    mocker.patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_sync", return_value=True
+    )
+    with pytest.raises(NotReadyError):
+        with MongoConnection(config) as mongo:
+            mongo.add_replset_member("hostname")
+
+    # verify we close connection and that no attempt to reconfigure was made
+    assert mock_client.return_value.close.call_count == 1
+
+    assert not any(
+        c.args and c.args[0] == "replSetReconfig"
+        for c in mock_client.return_value.admin.command.mock_calls
+    )
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_remove_replset_members_pymongo_error_handling(
+    mock_client, config, exception, expected_raise
+):
+    """Test failures related to PyMongo properly get handled in remove_replset_member.
+
+    Test also verifies that when an exception is raised we still close the client connection
+    and that no attempt to replSetReconfig is made.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.remove_replset_member("hostname")
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+def test_remove_replset_member_wait_to_remove(mocker, mock_client, config):
+    """Tests removing replica set members raises NotReadyError if another member is removing.
+
+    Test also verifies that when an exception is raised we still close the client connection
+    and that no attempt to replSetReconfig is made.
+    """
+    mocker.patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_removing",
+        return_value=True,
+    )
+    with pytest.raises(NotReadyError):
+        with MongoConnection(config) as mongo:
+            mongo.remove_replset_member("hostname")
+
+    # verify we close connection and that no attempt to reconfigure was made
+    assert mock_client.return_value.close.call_count == 1
+
+    assert not any(
+        c.args and c.args[0] == "replSetReconfig"
+        for c in mock_client.return_value.admin.command.mock_calls
+    )
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_create_user_error_handling(mocker, mock_client, config, exception, expected_raise):
+    """Test failures related to PyMongo properly get handled when creating a user.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    mocker.patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_removing")
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.create_user(config.username, config.password, config.roles)
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_update_user_error_handling(mock_client, config, exception, expected_raise):
+    """Test failures related to PyMongo properly get handled when updating a user.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.update_user(config)
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
+
+
+@pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+def test_drop_user_error_handling(mock_client, config, exception, expected_raise):
+    """Test failures related to PyMongo properly get handled when dropping a user.
+
+    Test also verifies that when an exception is raised we still close the client connection.
+    """
+    mock_client.return_value.admin.command.side_effect = exception
+    with pytest.raises(expected_raise):
+        with MongoConnection(config) as mongo:
+            mongo.drop_user("username")
+
+    # verify we close connection
+    assert mock_client.return_value.close.call_count == 1
@@ -1,53 +1,124 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-import unittest
-from unittest.mock import patch
+from functools import partial
+from operator import eq
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
-from ops import BlockedStatus
+import pytest
+from ops import BlockedStatus, EventBase, Relation
 from ops.testing import Harness
-from parameterized import parameterized
 from pymongo.errors import ConfigurationError, ConnectionFailure, OperationFailure
+from single_kernel_mongo.lib.charms.data_platform_libs.v0.data_interfaces import (
+    DatabaseProviderData,
+)
+from single_kernel_mongo.managers.mongo import MongoManager
+from single_kernel_mongo.utils.mongo_connection import MongoConnection
 
-from charm import MongoDBVMCharm
+from .helpers import charm_spec, patch_network_get
 
-from .helpers import patch_network_get
-
-PYMONGO_EXCEPTIONS = [
+PYMONGO_EXCEPTIONS = (
     (ConnectionFailure("error message"), ConnectionFailure),
     (ConfigurationError("error message"), ConfigurationError),
     (OperationFailure("error message"), OperationFailure),
-]
+)
 PEER_ADDR = {"private-address": "127.4.5.6"}
-RELATION_EVENTS = ["joined", "changed", "departed"]
-DEPARTED_IDS = [None, 0]
-
-
-class TestMongoProvider(unittest.TestCase):
-    @patch(
-        "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
-        return_value="1",
-    )
-    @patch_network_get(private_address="1.1.1.1")
-    def setUp(self, *unused):
-        self.harness = Harness(MongoDBVMCharm)
+DATABASE_REQUEST = PEER_ADDR | {"database": "test"}
+RELATION_DEPARTING = (True, False)
+ROLE_PREDICATES = {role: partial(eq, role) for role in ("config-server", "shard", "database")}
+RELATION_OPS = {
+    "joined": lambda harness, rel_id: harness.add_relation_unit(rel_id, "consumer/0"),
+    "changed": lambda harness, rel_id: harness.update_relation_data(
+        rel_id, "consumer/0", PEER_ADDR
+    ),
+    "departed": lambda harness, rel_id: harness.remove_relation_unit(rel_id, "consumer/0"),
+}
+
+
+class TestMongoProvider:
+    @pytest.fixture(scope="class", autouse=True)
+    def patch_charm_environment(self):
+        with (
+            patch(
+                "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
+                return_value="1",
+            ),
+            patch_network_get(private_address="1.1.1.1"),
+        ):
+            yield
+
+    @pytest.fixture(autouse=True)
+    def setup_harness(self, charm_class):
+        self.harness = Harness(charm_class, **charm_spec())
         self.harness.begin()
         self.harness.add_relation("database-peers", "mongodb-peers")
         self.harness.set_leader(True)
         self.charm = self.harness.charm
-        self.addCleanup(self.harness.cleanup)
-
-    @parameterized.expand([["config-server"], ["shard"]])
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    @patch("single_kernel_mongo.managers.mongo.MongoManager.reconcile_mongo_users_and_dbs")
-    def test_relation_event_relation_not_feasible(self, role: str, oversee_users, *unused):
+        yield self.harness
+        self.harness.cleanup()
+
+    @pytest.fixture
+    def oversee_users(self, monkeypatch):
+        reconcile = Mock()
+        monkeypatch.setattr(
+            self.harness.charm.operator.mongo_manager, "reconcile_mongo_users_and_dbs", reconcile
+        )
+        return reconcile
+
+    @pytest.fixture
+    def defer(self, monkeypatch):
+        defer = Mock()
+        monkeypatch.setattr(EventBase, "defer", defer)
+        return defer
+
+    @pytest.fixture
+    def user_exists(self, monkeypatch):
+        user_exists = Mock()
+        monkeypatch.setattr(MongoConnection, "user_exists", user_exists)
+        return user_exists
+
+    @pytest.fixture
+    def create_user(self, monkeypatch):
+        create_user = Mock()
+        monkeypatch.setattr(MongoConnection, "create_user", create_user)
+        return create_user
+
+    @pytest.fixture
+    def set_credentials(self, monkeypatch):
+        set_credentials = Mock()
+        monkeypatch.setattr(DatabaseProviderData, "set_credentials", set_credentials)
+        return set_credentials
+
+    @pytest.fixture
+    def auto_delete(self):
+        """Turns on auto-delete without dispatching config-changed through the charm."""
+        with self.harness.hooks_disabled():
+            self.harness.update_config({"auto-delete": True})
+
+    @pytest.fixture
+    def charm_role(self, monkeypatch, role: str):
+        """Makes the charm report `role` as its only role for the duration of a test."""
+        monkeypatch.setattr(self.harness.charm.operator.state, "is_role", ROLE_PREDICATES[role])
+        return role
+
+    def _make_consumer_relation(self) -> Relation:
+        """Adds a consumer requesting a database, without running any of the relation hooks."""
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation("database", "consumer")
+            self.harness.add_relation_unit(relation_id, "consumer/0")
+            self.harness.update_relation_data(relation_id, "consumer", DATABASE_REQUEST)
+        return self.harness.model.get_relation("database", relation_id)
+
+    def _fire_relation_events(self, relation_id: int):
+        """Drives a consumer unit through the joined, changed and departed hooks in turn."""
+        for relation_op in RELATION_OPS.values():
+            relation_op(self.harness, relation_id)
+
+    @pytest.mark.parametrize("role", ["config-server", "shard"])
+    @pytest.mark.usefixtures("charm_role")
+    def test_relation_event_relation_not_feasible(self, oversee_users):
         """Tests that relating with a wrong role sets a blocked status."""
-
-        def is_config_server_role(role_name: str):
-            return role_name == role
-
-        self.harness.charm.operator.state.is_role = is_config_server_role
-
         relation_id = self.harness.add_relation("database", "consumer")
         self.harness.add_relation_unit(relation_id, "consumer/0")
         self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
@@ -57,222 +128,155 @@ class TestMongoProvider(unittest.TestCase):
         )
         oversee_users.assert_not_called()
 
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    @patch("ops.framework.EventBase.defer")
-    @patch("single_kernel_mongo.managers.mongo.MongoManager.reconcile_mongo_users_and_dbs")
-    def test_relation_event_db_not_initialised(self, oversee_users, defer, *unused):
-        """Tests no database relations are handled until the database is initialised.
+    def test_relation_event_db_not_initialised(self, oversee_users, defer):
+        """Tests relation-changed is not handled until the database is initialised.
 
-        Users should not be "overseen" until the database has been initialised, no matter the
-        event hook (departed, joined, updated)
+        Users should not be "overseen" on relation-changed until the database has been
+        initialised. Joined and departed are covered by the membership test below.
         """
         # presets
-        self.harness.set_leader(True)
         relation_id = self.harness.add_relation("database", "consumer")
+        self.harness.add_relation_unit(relation_id, "consumer/0")
 
-        for relation_event in RELATION_EVENTS:
-            if relation_event == "joined":
-                self.harness.add_relation_unit(relation_id, "consumer/0")
-            elif relation_event == "changed":
-                self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
-            else:
-                self.harness.remove_relation_unit(relation_id, "consumer/0")
+        # relation-changed is the only hook that reaches the reconcile
+        self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
 
         oversee_users.assert_not_called()
         defer.assert_not_called()
 
-    @patch_network_get(private_address="1.1.1.1")
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    @patch("ops.framework.EventBase.defer")
-    @patch("single_kernel_mongo.managers.mongo.MongoManager.reconcile_mongo_users_and_dbs")
+    @pytest.mark.parametrize("departing", [False, True])
+    def test_relation_membership_db_not_initialised(self, oversee_users, defer, departing):
+        """Tests units joining or departing before the database is initialised are ignored."""
+        relation_id = self.harness.add_relation("database", "consumer")
+        self.harness.add_relation_unit(relation_id, "consumer/0")
+        if departing:
+            self.harness.remove_relation_unit(relation_id, "consumer/0")
+
+        oversee_users.assert_not_called()
+        defer.assert_not_called()
+
+    @pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
     def test_relation_event_oversee_users_mongo_failure(
-        self,
-        oversee_users,
-        defer,
-        get_rev,
+        self, oversee_users, defer, exception, expected_raise
     ):
         """Tests the errors related to pymongo when overseeing users result in a defer."""
         # presets
-        self.harness.set_leader(True)
         self.harness.charm.operator.state.db_initialised = True
         relation_id = self.harness.add_relation("database", "consumer")
+        self.harness.add_relation_unit(relation_id, "consumer/0")
+        oversee_users.side_effect = exception
 
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            oversee_users.side_effect = exception
-
-            for relation_event in RELATION_EVENTS:
-                if relation_event == "joined":
-                    self.harness.add_relation_unit(relation_id, "consumer/0")
-                elif relation_event == "changed":
-                    self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
-                else:
-                    self.harness.remove_relation_unit(relation_id, "consumer/0")
+        # relation-changed is the hook that reconciles users, one dispatch is enough to defer
+        self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
 
-            defer.assert_called()
+        oversee_users.assert_called_once()
+        defer.assert_called()
 
     # oversee_users raises AssertionError when unable to attain users from relation
-    @patch_network_get(private_address="1.1.1.1")
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    @patch("ops.framework.EventBase.defer")
-    @patch("single_kernel_mongo.managers.mongo.MongoManager.reconcile_mongo_users_and_dbs")
-    def test_relation_event_oversee_users_fails_to_get_relation(
-        self,
-        oversee_users,
-        defer,
-        get_rev,
-    ):
+    def test_relation_event_oversee_users_fails_to_get_relation(self, oversee_users):
         """Verifies that when users are formatted incorrectly an assertion error is raised."""
         # presets
-        self.harness.set_leader(True)
         self.harness.charm.operator.state.db_initialised = True
         relation_id = self.harness.add_relation("database", "consumer")
 
         # AssertionError is raised when unable to attain users from relation (due to name
         # formatting)
         oversee_users.side_effect = AssertionError
-        with self.assertRaises(AssertionError):
-            for relation_event in RELATION_EVENTS:
-                if relation_event == "joined":
-                    self.harness.add_relation_unit(relation_id, "consumer/0")
-                elif relation_event == "changed":
-                    self.harness.update_relation_data(relation_id, "consumer/0", PEER_ADDR)
-                else:
-                    self.harness.remove_relation_unit(relation_id, "consumer/0")
-
-    @patch_network_get(private_address="1.1.1.1")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.user_exists")
-    def test_oversee_users_get_users_failure(self, mock_user_exists):
+        with pytest.raises(AssertionError):
+            self._fire_relation_events(relation_id)
+
+    @pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+    @pytest.mark.parametrize("dep_id", RELATION_DEPARTING)
+    def test_oversee_users_get_users_failure(self, user_exists, dep_id, exception, expected_raise):
         """Verifies that when unable to retrieve users from mongod an exception is raised."""
-        relation_id = self.harness.add_relation("database", "consumer")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="consumer/0")
-        self.harness.update_relation_data(
-            relation_id, "consumer", PEER_ADDR | {"database": "test"}
-        )
-        relation = self.harness.model.get_relation(
-            relation_id=relation_id, relation_name="database"
-        )
-        for dep_id in [True, False]:
-            for exception, expected_raise in PYMONGO_EXCEPTIONS:
-                mock_user_exists.side_effect = exception
-                with self.assertRaises(expected_raise):
-                    self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
-                        relation=relation,
-                        relation_departing=dep_id,
-                        relation_changed=True,
-                    )
-
-    @patch_network_get(private_address="1.1.1.1")
-    @patch(
-        "single_kernel_mongo.utils.mongo_connection.MongoConnection.user_exists",
-        return_value=False,
-    )
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.create_user")
-    @patch(
-        "single_kernel_mongo.lib.charms.data_platform_libs.v0.data_interfaces.DatabaseProviderData.set_credentials"
-    )
-    def test_oversee_users_create_user_failure(self, set_credentials, create_user, user_exists):
+        relation = self._make_consumer_relation()
+        user_exists.side_effect = exception
+        with pytest.raises(expected_raise):
+            self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
+                relation=relation,
+                relation_departing=dep_id,
+                relation_changed=True,
+            )
+
+    @pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+    @pytest.mark.parametrize("dep_id", RELATION_DEPARTING)
+    def test_oversee_users_create_user_failure(
+        self, set_credentials, create_user, user_exists, dep_id, exception, expected_raise
+    ):
         """Verifies when user creation fails an exception is raised and no relations are set."""
         # presets, such that the need to create user relations is triggered
-        relation_id = self.harness.add_relation("database", "consumer")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="consumer/0")
-        self.harness.update_relation_data(
-            relation_id, "consumer", PEER_ADDR | {"database": "test"}
-        )
-        relation = self.harness.model.get_relation(
-            relation_id=relation_id, relation_name="database"
-        )
-        for dep_id in [True, False]:
-            for exception, expected_raise in PYMONGO_EXCEPTIONS:
-                create_user.side_effect = exception
-                with self.assertRaises(expected_raise):
-                    self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
-                        relation=relation,
-                        relation_departing=dep_id,
-                        relation_changed=True,
-                    )
-                set_credentials.assert_not_called()
-
-    @patch_network_get(private_address="1.1.1.1")
+        relation = self._make_consumer_relation()
+        user_exists.return_value = False
+        create_user.side_effect = exception
+        with pytest.raises(expected_raise):
+            self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
+                relation=relation,
+                relation_departing=dep_id,
+                relation_changed=True,
+            )
+        set_credentials.assert_not_called()
+
+    @pytest.mark.parametrize("dep_id", RELATION_DEPARTING)
     @patch("single_kernel_mongo.managers.mongo.MongoManager.add_user")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.update_user")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.remove_user")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.drop_database")
-    def test_oversee_users_no_auto_delete(self, drop_db, *unused):
+    def test_oversee_users_no_auto_delete(
+        self, drop_db, remove_user, update_user, add_user, dep_id
+    ):
         """Verifies when no-auto delete is specified databases are not dropped.."""
         # presets, such that the need to drop a database
-        relation_id = self.harness.add_relation("database", "consumer")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="consumer/0")
-        self.harness.update_relation_data(
-            relation_id, "consumer", PEER_ADDR | {"database": "test"}
-        )
-        relation = self.harness.model.get_relation(
-            relation_id=relation_id, relation_name="database"
-        )
+        relation = self._make_consumer_relation()
 
         self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
-            relation, relation_departing=True
+            relation, relation_departing=dep_id
         )
         drop_db.assert_not_called()
 
-    @patch_network_get(private_address="1.1.1.1")
+    @pytest.mark.parametrize("exception,expected_raise", PYMONGO_EXCEPTIONS)
+    @pytest.mark.usefixtures("auto_delete")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.add_user")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.update_user")
     @patch("single_kernel_mongo.managers.mongo.MongoManager.remove_user")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_databases")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.drop_database")
-    def test_oversee_users_mongo_databases_failure(self, drop_db, get_db, *unused):
+    def test_oversee_users_mongo_databases_failure(
+        self, drop_db, get_db, remove_user, update_user, add_user, exception, expected_raise
+    ):
         """Verifies failures in checking for databases with mongod result in raised exceptions."""
-        self.harness.set_leader(True)
         self.harness.charm.operator.state.db_initialised = True
-        self.harness.update_config({"auto-delete": True})
 
-        relation_id = self.harness.add_relation("database", "consumer")
-        self.harness.add_relation_unit(relation_id=relation_id, remote_unit_name="consumer/0")
-        self.harness.update_relation_data(
-            relation_id, "consumer", PEER_ADDR | {"database": "test"}
-        )
-        relation = self.harness.model.get_relation(
-            relation_id=relation_id, relation_name="database"
-        )
+        relation = self._make_consumer_relation()
 
         get_db.return_value = {"test"}
 
-        for exception, expected_raise in PYMONGO_EXCEPTIONS:
-            drop_db.side_effect = exception
-            with self.assertRaises(expected_raise):
-                self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
-                    relation, relation_departing=True
-                )
-
-    @parameterized.expand(
-        [
-            ["config-server", True, True],
-            ["shard", True, True],
-            ["database", False, True],
-            ["database", True, False],
-        ]
-    )
-    @patch_network_get(private_address="1.1.1.1")
-    @patch(
-        "single_kernel_mongo.lib.charms.data_platform_libs.v0.data_interfaces.DatabaseProviderData.set_credentials"
+        drop_db.side_effect = exception
+        with pytest.raises(expected_raise):
+            self.harness.charm.operator.mongo_manager.reconcile_mongo_users_and_dbs(
+                relation, relation_departing=True
+            )
+
+
+@pytest.mark.parametrize(
+    "role,db_init,is_leader",
+    [
+        ["config-server", True, True],
+        ["shard", True, True],
+        ["database", False, True],
+        ["database", True, False],
+    ],
+)
+def test_update_app_relation_data_protected(
+    monkeypatch, role: str, db_init: bool, is_leader: bool
+):
+    """Verifies the client databag is left alone until this unit may write it."""
+    set_credentials = Mock()
+    monkeypatch.setattr(DatabaseProviderData, "set_credentials", set_credentials)
+    # Only the guards are under test here, so they can run against stubs instead of a charm.
+    manager = SimpleNamespace(
+        charm=SimpleNamespace(unit=SimpleNamespace(is_leader=lambda: is_leader)),
+        state=SimpleNamespace(db_initialised=db_init, is_role=ROLE_PREDICATES[role]),
     )
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    def test_update_app_relation_data_protected(
-        self, role: str, db_init: str, is_leader: bool, charm_rev, set_creds
-    ):
-        def mock_role_call(*args):
-            return args == (role,)
-
-        self.harness.set_leader(is_leader)
-        self.harness.charm.operator.state.db_initialised = db_init
-        self.harness.update_config({"auto-delete": True})
-
-        self.harness.charm.operator.state.is_role = mock_role_call
-
-        relation_id = self.harness.add_relation("database", "consumer")
-        relation = self.harness.model.get_relation(
-            relation_id=relation_id, relation_name="database"
-        )
 
-        self.harness.charm.operator.mongo_manager.update_app_relation_data(relation)
-        set_creds.assert_not_called()
+    MongoManager.update_app_relation_data(manager, Mock(spec=Relation))
+    set_credentials.assert_not_called()
@@ -1,106 +1,135 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
-import unittest
+from functools import partial
+from operator import eq
 from unittest import mock
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
+import pytest
 from ops.model import ActiveStatus, BlockedStatus
 from ops.testing import Harness
-
-from charm import MongoDBVMCharm
-
-from .helpers import patch_network_get
-
-
-class TestCharm(unittest.TestCase):
-    @patch(
-        "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
-        return_value="1",
-    )
-    @patch_network_get(private_address="1.1.1.1")
-    def setUp(self, *unused):
-        self.harness = Harness(MongoDBVMCharm)
-        self.addCleanup(self.harness.cleanup)
+from pymongo import MongoClient
+from single_kernel_mongo.core.structured_config import MongoDBRoles
+from single_kernel_mongo.core.version_checker import VersionChecker
+from single_kernel_mongo.utils.mongo_connection import MongoConnection
+
+from .helpers import charm_spec, patch_network_get
+
+IS_REPLICATION = partial(eq, MongoDBRoles.REPLICATION)
+
+
+class TestCharm:
+    @pytest.fixture(scope="class", autouse=True)
+    def patch_charm_environment(self):
+        with (
+            patch(
+                "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
+                return_value="1",
+            ),
+            patch_network_get(private_address="1.1.1.1"),
+        ):
+            yield
+
+    @pytest.fixture(autouse=True)
+    def setup_harness(self, charm_class):
+        self.harness = Harness(charm_class, **charm_spec())
         self.harness.begin()
         self.peer_rel_id = self.harness.add_relation("database-peers", "database-peers")
         self.peer_rel_id = self.harness.add_relation("upgrade-version-a", "upgrade-version-a")
+        yield self.harness
+        self.harness.cleanup()
+
+    @pytest.fixture
+    def units_ready(self, monkeypatch):
+        """Sets up a leader replica set unit whose health checks can be driven by the tests.
+
+        Returns the mock standing in for `are_all_units_ready_for_upgrade`.
+        """
+        monkeypatch.setattr(
+            VersionChecker,
+            "is_status_related_to_mismatched_revision",
+            mock.Mock(return_value=False),
+        )
+        self.harness.set_leader(True)
+        self.harness.charm.unit.status = ActiveStatus()
+        monkeypatch.setattr(self.harness.charm.operator.state, "is_role", IS_REPLICATION)
+        units_ready = mock.Mock(return_value=True)
+        monkeypatch.setattr(
+            self.harness.charm.operator.upgrade_manager,
+            "are_all_units_ready_for_upgrade",
+            units_ready,
+        )
+        return units_ready
 
-    @patch_network_get(private_address="1.1.1.1")
+    @pytest.mark.usefixtures("units_ready")
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient", spec_set=MongoClient)
     @patch(
-        "single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status",
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
+        new_callable=PropertyMock,
     )
+    def test_is_cluster_healthy_unit_not_ready(self, is_ready, *unused):
+        """Tests that the cluster is unhealthy when the unit is not ready after restarting."""
+        is_ready.return_value = False
+        assert not self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
+
+    @pytest.mark.usefixtures("units_ready")
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status")
     @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
     @patch(
         "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
-    )
-    @patch(
-        "single_kernel_mongo.core.version_checker.VersionChecker.is_status_related_to_mismatched_revision"
-    )
-    @patch(
-        "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
-        return_value="1",
-    )
-    @patch(
-        "single_kernel_mongo.core.abstract_upgrades.GenericMongoDBUpgradeManager.are_all_units_ready_for_upgrade"
+        new_callable=PropertyMock,
     )
     @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_sync")
-    def test_is_cluster_healthy(
-        self,
-        is_any_sync,
-        are_all_units_active,
-        get_rev,
-        is_status_related_to_mismatched_revision,
-        is_ready,
-        mock_client,
-        *unused,
-    ):
-        """Test is_cluster_healthy function."""
-
-        def is_replication_mock_call(*args):
-            return args == ("replication",)
-
-        self.harness.set_leader(True)
-        is_status_related_to_mismatched_revision.return_value = False
-
-        mock_units_ready = mock.Mock()
-        mock_units_ready.return_value = True
-        self.harness.charm.operator.upgrade_manager.are_all_units_ready_for_upgrade = (
-            mock_units_ready
-        )
-
-        # case 1: unit is not ready after restarting
-        is_ready.return_value = False
-        assert not self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
-
-        # case 2: cluster is still syncing
+    def test_is_cluster_healthy_still_syncing(self, is_any_sync, is_ready, *unused):
+        """Tests that the cluster is unhealthy while it is still syncing."""
         is_ready.return_value = True
-
-        self.harness.charm.operator.state.is_role = is_replication_mock_call
-        self.harness.charm.unit.status = ActiveStatus()
         is_any_sync.return_value = True
         assert not self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
 
-        # case 3: unit is not active
+    @pytest.mark.usefixtures("units_ready")
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient", spec_set=MongoClient)
+    @patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
+        new_callable=PropertyMock,
+    )
+    def test_is_cluster_healthy_unit_not_active(self, is_ready, *unused):
+        """Tests that the cluster is unhealthy when the unit is not active."""
         self.harness.charm.unit.status = BlockedStatus()
-        is_any_sync.return_value = False
+        is_ready.return_value = True
         assert not self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
 
-        # case 4: cluster is healthy
-        self.harness.charm.unit.status = ActiveStatus()
-        is_any_sync.return_value = False
-        mock_client.return_value.admin.command.return_value = mock.Mock()
-        result = self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
-        assert result
+    @pytest.mark.usefixtures("units_ready")
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection.get_replset_status")
+    @patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoClient",
+        **{"return_value.admin.command.return_value": {}},
+    )
+    @patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
+        new_callable=PropertyMock,
+        return_value=True,
+    )
+    @patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_any_sync",
+        return_value=False,
+    )
+    def test_is_cluster_healthy_healthy(self, *unused):
+        """Tests that the cluster is healthy when every check passes."""
+        assert self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
 
-        # case 5: not all units are active
-        self.harness.charm.operator.upgrade_manager.are_all_units_ready_for_upgrade.return_value = (
-            False
-        )
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient", spec_set=MongoClient)
+    @patch(
+        "single_kernel_mongo.utils.mongo_connection.MongoConnection.is_ready",
+        new_callable=PropertyMock,
+    )
+    def test_is_cluster_healthy_units_not_ready(self, is_ready, mock_client, units_ready):
+        """Tests that the cluster is unhealthy when not all units are ready for upgrade."""
+        units_ready.return_value = False
+        is_ready.return_value = True
         assert not self.harness.charm.operator.upgrade_manager.is_cluster_healthy()
 
-    @patch_network_get(private_address="1.1.1.1")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection")
-    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient")
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoConnection", spec_set=MongoConnection)
+    @patch("single_kernel_mongo.utils.mongo_connection.MongoClient", spec_set=MongoClient)
     @patch(
         "single_kernel_mongo.core.abstract_upgrades.GenericMongoDBUpgradeManager.is_write_on_secondaries"
     )
@@ -1,8 +1,8 @@
 # Copyright 2024 Canonical Ltd.
 # See LICENSE file for licensing details.
-import unittest
 from unittest.mock import patch
 
+import pytest
 from data_platform_helpers.version_check import (
     DEPLOYMENT_TYPE,
     VERSION_CONST,
@@ -12,7 +12,7 @@ from ops.testing import Harness
 
 from charm import MongoDBVMCharm
 
-from .helpers import patch_network_get
+from .helpers import charm_spec, patch_network_get
 
 CHARMHUB_DEPLOYMENT = "ch"
 LOCAL_DEPLOYMENT = "local"
@@ -25,14 +25,20 @@ APP_1 = "APP_1"
 APP_2 = "APP_2"
 
 
-class TestCharm(unittest.TestCase):
-    @patch("single_kernel_mongo.managers.mongodb_operator.get_charm_revision")
-    @patch_network_get(private_address="1.1.1.1")
-    def setUp(self, get_charm_revision):
-        get_charm_revision.return_value = CHARM_VERSION
-        self.harness = Harness(MongoDBVMCharm)
-        self.addCleanup(self.harness.cleanup)
-        self.harness.begin()
+class TestCharm:
+    @pytest.fixture(autouse=True)
+    def setup_harness(self):
+        with (
+            patch(
+                "single_kernel_mongo.managers.mongodb_operator.get_charm_revision",
+                return_value=CHARM_VERSION,
+            ),
+            patch_network_get(private_address="1.1.1.1"),
+        ):
+            self.harness = Harness(MongoDBVMCharm, **charm_spec())
+            self.harness.begin()
+        yield self.harness
+        self.harness.cleanup()
 
     def add_invalid_relation(self, deployment=LOCAL_DEPLOYMENT):
         rel_id = self.harness.add_relation(RELATION_TO_CHECK_VERSION, APP_0)
@@ -68,7 +74,7 @@ class TestCharm(unittest.TestCase):
 
         # case two: missing version info
         self.add_relation_with_no_version()
-        with self.assertRaises(NoVersionError):
+        with pytest.raises(NoVersionError, match=f"Expected {APP_2} to have version info"):
             self.harness.charm.operator.cross_app_version_checker.get_invalid_versions()
 
     def test_get_version_of_related_app(self):
@@ -82,7 +88,7 @@ class TestCharm(unittest.TestCase):
 
         # case two: missing version info
         self.add_relation_with_no_version()
-        with self.assertRaises(NoVersionError):
+        with pytest.raises(NoVersionError, match=f"Expected {APP_2} to have version info"):
             self.harness.charm.operator.cross_app_version_checker.get_version_of_related_app(APP_2)
 
     def test_is_related_app_locally_built_charm(self):
@@ -97,5 +103,5 @@ class TestCharm(unittest.TestCase):
 
         # case three: missing version info
         self.add_relation_with_no_version()
-        with self.assertRaises(NoVersionError):
+        with pytest.raises(NoVersionError, match=f"Expected {APP_2} to have version info"):
             self.harness.charm.operator.cross_app_version_checker.is_local_charm(APP_2)